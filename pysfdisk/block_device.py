@@ -28,58 +28,244 @@ Providing data about partition types, filesystem, create backup of mbr, partitio
 # along with pysfdisk.  If not, see <http://www.gnu.org/licenses/>
 
 import os
-import json
+import re
+import shlex
+import stat
+import shutil
 import pathlib
+import logging
+import functools
+import itertools
+import contextlib
 import tempfile
 import subprocess  # nosec # noqa: S404
-from typing import Union
+from typing import Union, Iterator
 from subprocess import PIPE, DEVNULL  # nosec # noqa: S404
 
-from pysfdisk.errors import NotRunningAsRoot, BlockDeviceDoesNotExist  # noqa: I900
+from pysfdisk import uring_backend  # noqa: I900
+from pysfdisk.errors import NotABlockDevice, NotRunningAsRoot, BlockDeviceDoesNotExist  # noqa: I900
 from pysfdisk.partition import Partition  # noqa: I900
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
 
-def find_executable(name: str) -> Union[str, classmethod]:
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
+LOGGER = logging.getLogger(__name__)
+
+STANDARD_EXECUTABLE_PATHS = ("/bin", "/sbin", "/usr/local/bin", "/usr/local/sbin", "/usr/bin", "/usr/sbin")
+MBR_SIZE = 512
+# All partitions of a block device share the same disk, more concurrent readers mostly add seeks
+PARTCLONE_MAX_WORKERS = 2
+DISK_INFO_SEPARATOR = "---"
+LSBLK_LINE_RE = re.compile(r'NAME="([^"]*)"\s+TYPE="([^"]*)"\s+FSTYPE="([^"]*)"')
+SFDISK_PARTITION_PREFIX = "partitiontable.partitions.item"
+IJSON_STRUCTURE_EVENTS = frozenset(("start_map", "end_map", "start_array", "end_array", "map_key"))
+
+
+@functools.lru_cache(maxsize=None)
+def _executable_index() -> dict:
     """
-    Return valid executable path for provided name.
+    Index all entries of standard executable directories with a single directory read per directory.
+
+    The index is built on first use, so importing the module does not touch the filesystem.
+
+    :return: dict which maps executable name to its path, directories listed earlier take precedence
+
+    """
+    index = {}
+    for directory in STANDARD_EXECUTABLE_PATHS:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    index.setdefault(entry.name, entry.path)
+        except OSError:
+            continue
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def find_executable(name: str) -> Union[str, None]:
+    """
+    Return valid executable path for provided name, standard system directories take precedence over $PATH.
 
     :param name: binary, executable name
-    :return: Return the string representation of the path with forward (/) slashes.
+    :return: Return the string representation of the path, None when executable was not found
+
+    """
+    return _executable_index().get(name) or shutil.which(name)
+
+
+class Executable:
+    """Class attribute which resolves executable path on first access instead of at class creation."""
+
+    def __init__(self, name: str):
+        """Set member variables."""
+        self.name = name
+
+    def __get__(self, instance, owner) -> Union[str, None]:
+        """Return executable path, lookups are cached by find_executable."""
+        return find_executable(name=self.name)
+
+
+def iter_partition_table(sfdisk_output) -> Iterator[tuple]:
+    """
+    Parse sfdisk JSON output incrementally.
+
+    Uses ijson when it is installed, otherwise the output is read and parsed at once with orjson, or json when orjson
+    is not installed either.
+
+    :param sfdisk_output: binary file object with output of sfdisk --json
+    :return: iterator of (key, value) tuples of the partitiontable object, every partition is yielded separately under
+        the "partitions" key
+
+    """
+    if ijson is None:
+        partition_table = json_loads(sfdisk_output.read())["partitiontable"]
+        for key, value in partition_table.items():
+            if key == "partitions":
+                for partition_config in value:
+                    yield key, partition_config
+            else:
+                yield key, value
+        return
+
+    builder = None
+    for prefix, event, value in ijson.parse(sfdisk_output):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == SFDISK_PARTITION_PREFIX and event == "end_map":
+                yield "partitions", builder.value
+                builder = None
+        elif prefix == SFDISK_PARTITION_PREFIX and event == "start_map":
+            builder = ijson.common.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix.count(".") == 1 and prefix.startswith("partitiontable.") and event not in IJSON_STRUCTURE_EVENTS:
+            yield prefix.split(".", 1)[1], value
+
+
+def _start_process(command_list: list, processes: list) -> None:
+    """
+    Start command with stderr redirected to its own temporary file, so output of concurrent processes is not mixed.
+
+    :param command_list: command to be started
+    :param processes: list of (command list, process, stderr file) tuples the started process is appended to
+
+    """
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(command_list, stdout=DEVNULL, stderr=stderr_file)  # nosec # noqa: S603,DUO116
+    except BaseException:
+        stderr_file.close()
+        raise
+    processes.append((command_list, process, stderr_file))
+
+
+def _wait_processes(pending: Iterator[list], processes: list) -> None:
+    """
+    Wait for processes in start order, one pending command is started whenever a process exits.
+
+    :param pending: commands which were not started yet
+    :param processes: list of (command list, process, stderr file) tuples of started processes
+
+    """
+    index = 0
+    while index < len(processes):
+        processes[index][1].wait()
+        index += 1
+        for command_list in itertools.islice(pending, 1):
+            _start_process(command_list, processes)
+
+
+def _run_dumps(commands: list, raw_dumps: list, poll: bool, max_workers: int) -> None:
+    """
+    Run partclone commands with at most max_workers processes at once, and raw copies while they are running.
+
+    When anything fails, started processes are killed before the error is re-raised.
+
+    :param commands: partclone command lists
+    :param raw_dumps: list of (partition path, image path) tuples to be copied via io_uring
+    :param poll: use polling io_uring rings for raw copies
+    :param max_workers: maximum number of concurrently running partclone processes
+
+    """
+    pending = iter(commands)
+    processes = []
+    try:
+        for command_list in itertools.islice(pending, max_workers):
+            _start_process(command_list, processes)
+        for device_path, destination_file in raw_dumps:
+            uring_backend.dump_partition_raw(src_path=device_path, dst_path=destination_file, poll=poll)
+        _wait_processes(pending, processes)
+    except BaseException:
+        _stop_processes(processes)
+        raise
+    _check_processes(processes)
+
+
+def _stop_processes(processes: list) -> None:
+    """
+    Kill and reap started processes, processes which already exited are only reaped.
+
+    :param processes: list of (command list, process, stderr file) tuples
 
     """
-    standard_executable_paths = ["/bin", "/sbin", "/usr/local/bin", "/usr/local/sbin", "/usr/bin", "/usr/sbin"]
+    for _, process, stderr_file in processes:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        stderr_file.close()
 
-    for path in standard_executable_paths:
-        executable_path = pathlib.Path(path) / name
-        if executable_path.exists():
-            return executable_path.as_posix()
 
-    return FileNotFoundError
+def _check_processes(processes: list) -> None:
+    """
+    Raise CalledProcessError with captured stderr for the first process which exited with non-zero status.
+
+    :param processes: list of (command list, process, stderr file) tuples of already exited processes
+
+    """
+    try:
+        for command_list, process, stderr_file in processes:
+            if process.returncode:
+                stderr_file.seek(0)
+                raise subprocess.CalledProcessError(process.returncode, command_list, stderr=stderr_file.read())
+    finally:
+        for _, _, stderr_file in processes:
+            stderr_file.close()
 
 
 class BlockDevice:
     """Provide interface to obtain and set partition tables."""
 
-    DD_EXEC = find_executable(name="dd")
-    LSBLK_EXEC = find_executable(name="lsblk")
-    PXZ_EXEC = find_executable(name="pxz")
-    SFDISK_EXEC = find_executable(name="sfdisk")
-    SUDO_EXEC = find_executable(name="sudo")
-    TAR_EXEC = find_executable(name="tar")
+    DD_EXEC = Executable(name="dd")
+    LSBLK_EXEC = Executable(name="lsblk")
+    PXZ_EXEC = Executable(name="pxz")
+    SFDISK_EXEC = Executable(name="sfdisk")
+    SH_EXEC = Executable(name="sh")
+    SUDO_EXEC = Executable(name="sudo")
+    TAR_EXEC = Executable(name="tar")
 
     def __init__(self, path, use_sudo=False):
         """Set member variables, perform checks and obtain the initial partition table."""
         # Setup member variables
         self.path = path
         self.use_sudo = use_sudo
+        self._cmd_prefix = [self.SUDO_EXEC] if use_sudo else []
         self.partitions = {}
         self.label = None
         self.uuid = None
+        self._fs_types_cache = None
+        self._stat = None
 
         self._assert_root()
         self._ensure_exists()
-        self._read_partition_table()
-        self._umount_partitions()
+        lsblk_output = self._collect_disk_info()
+        self._umount_partitions(lsblk_output=lsblk_output)
         self._temp_dir = tempfile.mkdtemp(dir=tempfile.gettempdir())
 
     def get_partitions(self):
@@ -88,89 +274,170 @@ class BlockDevice:
 
     def read_partition_table(self):
         """Read partition table to string."""
-        command_list = [self.SFDISK_EXEC, "-d", self.path]
-        if self.use_sudo:
-            command_list.insert(0, self.SUDO_EXEC)
+        command_list = self._cmd_prefix + [self.SFDISK_EXEC, "-d", self.path]
         process = subprocess.Popen(command_list, stdout=PIPE)  # nosec # noqa: S603,DUO116
         partition_table = process.communicate()[0]
         return partition_table.decode()
 
+    def dump_partition_table_compressed(self, destination_file: str) -> str:
+        """
+        Dump partition table to xz compressed file.
+
+        sfdisk output is piped straight into pxz, so the partition table is never held in memory.
+
+        :param destination_file: The path of file to which compressed partition table will be written
+        :return: path of the compressed file
+
+        """
+        sfdisk_command = self._cmd_prefix + [self.SFDISK_EXEC, "-d", self.path]
+        pxz_command = [self.PXZ_EXEC]
+        with open(destination_file, "wb") as destination:
+            try:
+                # Leaving the with blocks closes the pipe and waits for both processes, also when pxz fails to start
+                with subprocess.Popen(sfdisk_command, stdout=PIPE) as sfdisk:  # nosec # noqa: S603,DUO116
+                    with subprocess.Popen(  # nosec # noqa: S603,DUO116
+                        pxz_command, stdin=sfdisk.stdout, stdout=destination
+                    ) as pxz:
+                        # Let sfdisk receive SIGPIPE if pxz exits early
+                        sfdisk.stdout.close()
+                if sfdisk.returncode:
+                    raise subprocess.CalledProcessError(sfdisk.returncode, sfdisk_command)
+                if pxz.returncode:
+                    raise subprocess.CalledProcessError(pxz.returncode, pxz_command)
+            except BaseException:
+                # Do not leave a truncated archive behind
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(destination_file)
+                raise
+        return destination_file
+
     def dump_mbr(self, destination_file: str) -> Union[str, None]:
         """
         Dump MBR to file.
 
+        The sector is read directly when the device is readable by the current user, dd is only used as
+        a fallback when sudo is required to access it.
+
         :param destination_file: The name of file to which disk data will be dumped
-        :return: output of dd command
+        :return: None
 
         """
-        command_list = [self.DD_EXEC, f"if={self.path}", f"of={self._temp_dir}/{destination_file}", "bs=512", "count=1"]
-        if self.use_sudo:
-            command_list.insert(0, self.SUDO_EXEC)
+        try:
+            device_fd = os.open(self.path, os.O_RDONLY)
+        except PermissionError:
+            if not self.use_sudo:
+                raise
+        else:
+            try:
+                mbr = os.pread(device_fd, MBR_SIZE, 0)
+            finally:
+                os.close(device_fd)
+            pathlib.Path(self._temp_dir, destination_file).write_bytes(mbr)
+            return None
+
+        command_list = self._cmd_prefix + [
+            self.DD_EXEC,
+            f"if={self.path}",
+            f"of={self._temp_dir}/{destination_file}",
+            f"bs={MBR_SIZE}",
+            "count=1",
+        ]
         save_mbr = subprocess.run(command_list, stdout=PIPE, stderr=PIPE, check=True)  # nosec # noqa: S603,DUO116
         return save_mbr.check_returncode()
 
-    def _change_file_permissions(self, file_name: str):
+    def _change_file_permissions(self, *file_names: str):
         """
-        Change file permission for provided file name.
+        Change file permission for provided file names with a single chmod call.
 
-        :param file_name: The name of file on which new permissions be applied
+        :param file_names: The names of files on which new permissions be applied
         :return:
 
         """
-        command_list = ["chmod", "644", f"{self._temp_dir}/{file_name}"]  # nosec # noqa: S603,DUO116
-        if self.use_sudo:
-            command_list.insert(0, self.SUDO_EXEC)
+        file_paths = [f"{self._temp_dir}/{file_name}" for file_name in file_names]
+        command_list = self._cmd_prefix + ["chmod", "644", *file_paths]
         return subprocess.check_output(command_list)  # nosec # noqa: S603,DUO116
 
-    def dump_partitions(self) -> dict:
+    def dump_partitions(self, fast_backup: bool = False, max_workers: int = PARTCLONE_MAX_WORKERS) -> dict:
         """
-        Create backup of the partition to file via partclone.
+        Create backup of the partitions to files via partclone, partitions partclone cannot image are copied raw.
 
+        :param fast_backup: copy all partitions raw via io_uring with polling rings when it is available
+        :param max_workers: maximum number of concurrently running partclone processes
         :return: dict which contains name of partition and file path to which backup was saved
 
         """
-        command_list = []
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        commands = []
+        raw_dumps = []
         destination_files = {}
 
-        partitions_list = self.get_fs_types()
-        for partition, fs_type in partitions_list.items():
-            if fs_type == "vfat":
-                command_list = [
-                    find_executable(name=f"partclone.fat"),
-                    "-I",
-                    "-F",
-                    "-d",
-                    "-c",
-                    "-s",
-                    f"/dev/{partition}",
-                    "-o",
-                    f"{self._temp_dir}/{partition}",
-                ]
-            elif fs_type == "ext4":
-                command_list = [
-                    find_executable(name=f"partclone.{fs_type}"),
-                    "-d",
-                    "-c",
-                    "-s",
-                    f"/dev/{partition}",
-                    "-o",
-                    f"{self._temp_dir}/{partition}",
-                ]
-            destination_files[partition] = f"{self._temp_dir}/{partition}"
-
-            if self.use_sudo:
-                command_list.insert(0, self.SUDO_EXEC)
-                subprocess.run(command_list, check=True)  # nosec # noqa: S603,DUO116
-
-                self._change_file_permissions(file_name=partition)
+        fs_types = self.get_fs_types()
+        for partition in self.partitions.values():
+            fs_type = fs_types.get(partition.device_name)
+            destination_file = os.path.join(self._temp_dir, partition.device_name)
+            command_list = self._partclone_command(fs_type, partition.node, destination_file)
+            if (fast_backup or command_list is None) and self._raw_dump_possible(partition.node):
+                raw_dumps.append((partition.node, destination_file))
+            elif command_list is not None:
+                commands.append((partition.device_name, self._cmd_prefix + command_list))
+            else:
+                LOGGER.warning(
+                    "Skipping partition %s, no partclone executable for filesystem %s and it cannot be copied raw",
+                    partition.node,
+                    fs_type,
+                )
+                continue
+            destination_files[partition.device_name] = destination_file
+
+        _run_dumps([command_list for _, command_list in commands], raw_dumps, poll=fast_backup, max_workers=max_workers)
+
+        if self.use_sudo and commands:
+            self._change_file_permissions(*(partition for partition, _ in commands))
 
         return destination_files
 
+    @staticmethod
+    def _partclone_command(fs_type: Union[str, None], device_path: str, destination_file: str) -> Union[list, None]:
+        """
+        Build partclone command which images a partition.
+
+        :param fs_type: filesystem type reported by lsblk, None for partitions without a filesystem
+        :param device_path: path of the partition block device
+        :param destination_file: path of the image file
+        :return: command list, None when partclone does not support the filesystem
+
+        """
+        if fs_type is None:
+            return None
+        partclone_executable = find_executable(name="partclone.fat" if fs_type == "vfat" else f"partclone.{fs_type}")
+        if partclone_executable is None:
+            return None
+        # Ignore filesystem check results and force imaging of FAT filesystems with the dirty bit set
+        options = ["-I", "-F"] if fs_type == "vfat" else []
+        return [partclone_executable, *options, "-d", "-c", "-s", device_path, "-o", destination_file]
+
+    @staticmethod
+    def _raw_dump_possible(device_path: str) -> bool:
+        """
+        Check whether the partition can be copied raw via io_uring.
+
+        Raw copies run in the current process, so the partition must be readable without sudo.
+
+        :param device_path: path of the partition block device
+        :return: True when io_uring is available and the partition is readable
+
+        """
+        if not uring_backend.is_available():
+            return False
+        if not os.access(device_path, os.R_OK):
+            LOGGER.warning("%s is not readable by the current user, it cannot be copied raw", device_path)
+            return False
+        return True
+
     def _delete_temp_dir(self) -> None:
 
-        command_list = ["rm", "-rf", self._temp_dir]
-        if self.use_sudo:
-            command_list.insert(0, self.SUDO_EXEC)
+        command_list = self._cmd_prefix + ["rm", "-rf", self._temp_dir]
         subprocess.check_output(command_list)  # nosec # noqa: S603,DUO116
 
     def compress_dumped_partitions(self, target_dir: str, file_name: str = "compressed_partitions") -> str:
@@ -182,7 +449,7 @@ class BlockDevice:
         :return: full path to the compressed archive
 
         """
-        command_list = [
+        command_list = self._cmd_prefix + [
             self.TAR_EXEC,
             "-I",
             self.PXZ_EXEC,
@@ -192,89 +459,155 @@ class BlockDevice:
             self._temp_dir,
             ".",
         ]
-        if self.use_sudo:
-            command_list.insert(0, self.SUDO_EXEC)
-            subprocess.check_output(command_list)  # nosec # noqa: S603
+        subprocess.check_output(command_list)  # nosec # noqa: S603
 
         # Delete temporary directory
         self._delete_temp_dir()
 
         return f"{target_dir}/{file_name}.tar.xz"
 
-    def _umount_partitions(self) -> None:
+    def _umount_partitions(self, lsblk_output: Union[str, None] = None) -> None:
         """
-        Umount mounted partition to allow it to be processed by partclone or dd.
+        Umount mounted partitions to allow them to be processed by partclone or dd.
+
+        All partitions are passed to a single umount call, partitions which are not mounted are ignored.
 
-        :return: return code from the dd command
+        :param lsblk_output: output of lsblk in pairs (-P) mode, lsblk is invoked when not provided
+        :return:
 
         """
-        partition_list = self.get_fs_types()
+        fs_types = self.get_fs_types(lsblk_output=lsblk_output)
+        device_paths = [
+            partition.node for partition in self.partitions.values() if partition.device_name in fs_types
+        ]
+        if not device_paths:
+            return
 
-        # pylint: disable=unused-variable
-        for key, value in partition_list.items():
-            command_list = ["umount", f"/dev/{key}"]
-            if self.use_sudo:
-                command_list.insert(0, self.SUDO_EXEC)
-            subprocess.run(command_list, stdout=DEVNULL, stderr=DEVNULL, check=False)  # nosec  # noqa: S603
+        command_list = self._cmd_prefix + ["umount", *device_paths]
+        subprocess.run(command_list, stdout=DEVNULL, stderr=DEVNULL, check=False)  # nosec  # noqa: S603
 
-    def get_fs_types(self) -> dict:
+    def get_fs_types(self, lsblk_output: Union[str, None] = None) -> dict:
         """
-        Get partition filesystem type via lsblk.
+        Get partition filesystem type via lsblk, lsblk is scoped to this block device only.
+
+        The result is cached on the instance until the partition layout is re-read.
 
+        :param lsblk_output: output of lsblk in pairs (-P) mode, lsblk is invoked when not provided
         :return: fs_types, dict which contain partition name and filesystem type
 
         """
-        disk_name = self.path.split("/")[2]
-        fs_types = {}
+        if lsblk_output is None and self._fs_types_cache is not None:
+            return self._fs_types_cache
 
-        command_list = [self.LSBLK_EXEC, "-o", "NAME,TYPE,FSTYPE", "-b", "-J"]
-        if self.use_sudo:
-            command_list.insert(0, self.SUDO_EXEC)
-        command_output = json.loads(subprocess.check_output(command_list))  # nosec # noqa: S603,DUO116
-        all_disks = command_output.get("blockdevices")
+        fs_types = {}
 
-        for disk in all_disks:
-            if disk.get("name") == disk_name:
-                all_disks = disk.get("children")
+        if lsblk_output is None:
+            command_list = self._cmd_prefix + [self.LSBLK_EXEC, "-o", "NAME,TYPE,FSTYPE", "-b", "-P", self.path]
+            lsblk_output = subprocess.check_output(command_list).decode()  # nosec # noqa: S603,DUO116
 
-        for _ in all_disks:
-            if _.get("fstype"):
-                fs_types[_.get("name")] = _.get("fstype")
+        for line in lsblk_output.splitlines():
+            match = LSBLK_LINE_RE.match(line)
+            if not match:
+                continue
+            name, device_type, fs_type = match.groups()
+            if device_type == "part" and fs_type:
+                fs_types[name] = fs_type
 
+        self._fs_types_cache = fs_types
         return fs_types
 
-    def _read_partition_table(self):
-        """Create the partition table using sfdisk and load partitions."""
-        command_list = [self.SFDISK_EXEC, "--json", self.path]
-        if self.use_sudo:
-            command_list.insert(0, self.SUDO_EXEC)
-        disk_config = json.loads(subprocess.check_output(command_list))  # nosec # noqa: S603,DUO116
-        self.label = disk_config["partitiontable"]["label"] or None
-        self.uuid = disk_config["partitiontable"]["id"] or None
+    def _invalidate_fs_cache(self) -> None:
+        """Drop cached filesystem types, must be called whenever the partition layout may have changed."""
+        self._fs_types_cache = None
+
+    def _collect_disk_info(self) -> str:
+        """
+        Read lsblk filesystem types and load the sfdisk partition table with a single shell invocation.
+
+        lsblk output is emitted first, so the sfdisk JSON which follows the separator can be parsed while it is read.
 
-        for partition_config in disk_config["partitiontable"]["partitions"]:
-            partition = Partition.load_from_sfdisk_output(partition_config, self)
-            self.partitions[partition.get_partition_number()] = partition
+        :return: lsblk pairs output
+
+        """
+        script = (
+            f"{shlex.quote(self.LSBLK_EXEC)} -o NAME,TYPE,FSTYPE -b -P {shlex.quote(self.path)}"
+            f" && echo {DISK_INFO_SEPARATOR}"
+            f" && {shlex.quote(self.SFDISK_EXEC)} --json {shlex.quote(self.path)}"
+        )
+        command_list = self._cmd_prefix + [self.SH_EXEC, "-c", script]
+
+        lsblk_lines = []
+        with subprocess.Popen(command_list, stdout=PIPE) as process:  # nosec # noqa: S603,DUO116
+            try:
+                for line in iter(process.stdout.readline, b""):
+                    if line.rstrip(b"\n") == DISK_INFO_SEPARATOR.encode():
+                        break
+                    lsblk_lines.append(line)
+                self._read_partition_table(sfdisk_output=process.stdout)
+            except Exception:
+                # Parsing fails on truncated output, report the failing command instead. Unread output is drained
+                # first, the command could otherwise block on a full pipe and never exit
+                process.communicate()
+                if process.returncode:
+                    raise subprocess.CalledProcessError(process.returncode, command_list) from None
+                raise
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command_list)
+        return b"".join(lsblk_lines).decode()
+
+    def _read_partition_table(self, sfdisk_output):
+        """
+        Load partitions from the sfdisk JSON output.
+
+        Partition objects are created while the output is parsed, when ijson is installed the output is never
+        buffered as a whole.
+
+        :param sfdisk_output: binary file object with output of sfdisk --json
+
+        """
+        self._invalidate_fs_cache()
+        self.partitions = {}
+        self.label = None
+        self.uuid = None
 
-    def run(self, mbr_filename: str, target_dir: str) -> str:
+        for key, value in iter_partition_table(sfdisk_output):
+            if key == "label":
+                self.label = value or None
+            elif key == "id":
+                self.uuid = value or None
+            elif key == "partitions":
+                partition = Partition.load_from_sfdisk_output(value, self)
+                self.partitions[partition.get_partition_number()] = partition
+
+    def run(
+        self, mbr_filename: str, target_dir: str, fast_backup: bool = False, max_workers: int = PARTCLONE_MAX_WORKERS
+    ) -> str:
         """
         Create archive from disk partitions.
 
         :param mbr_filename: The name of file which will contain mbr data
         :param target_dir: The name of directory in which compressed archive will be placed
+        :param fast_backup: copy partitions raw via io_uring instead of partclone, see dump_partitions
+        :param max_workers: maximum number of concurrently running partclone processes
         :return: The full path to the compressed archive file
 
         """
         with open(f"{self._temp_dir}/partition_table", "w") as file:
             file.write(self.read_partition_table())
         self.dump_mbr(destination_file=mbr_filename)
-        self.dump_partitions()
+        self.dump_partitions(fast_backup=fast_backup, max_workers=max_workers)
         compressed_file_name = self.compress_dumped_partitions(target_dir=target_dir)
         return compressed_file_name
 
     def _ensure_exists(self):
-        if not os.path.exists(self.path):
-            raise BlockDeviceDoesNotExist("Block device %s does not exist" % self.path)
+        """Ensure that the path exists and is a block device, keep its stat result for later use."""
+        try:
+            device_stat = os.stat(self.path)
+        except FileNotFoundError:
+            raise BlockDeviceDoesNotExist("Block device %s does not exist" % self.path) from None
+        if not stat.S_ISBLK(device_stat.st_mode):
+            raise NotABlockDevice("%s is not a block device" % self.path)
+        self._stat = device_stat
 
     def _assert_root(self):
         """Ensure that the script is being run as root, or 'as root' has been specified."""
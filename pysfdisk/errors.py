@@ -49,3 +49,10 @@ class MissingAttribute(PysfdiskException):
 
     # pylint: disable=unnecessary-pass
     pass
+
+
+class NotABlockDevice(PysfdiskException):
+    """Path exists but is not a block device."""
+
+    # pylint: disable=unnecessary-pass
+    pass
@@ -22,6 +22,7 @@
 # You should have received a copy of the GNU General Public License
 # along with pysfdisk.  If not, see <http://www.gnu.org/licenses/>
 
+import os
 import re
 
 from pysfdisk.errors import MissingAttribute  # noqa: I900
@@ -42,9 +43,12 @@ class Partition:
         if "size" not in config:
             raise MissingAttribute("size attribute not found in sfdisk config")
 
-        partition_number = re.match("^.*([0-9]+)$", config["node"]).group(1)
+        # Non-greedy prefix, so all trailing digits form the number, e.g. 12 for /dev/sda12
+        partition_number = re.match("^.*?([0-9]+)$", config["node"]).group(1)
         partition_config = {
             "node": config["node"],
+            # Kernel name as reported by lsblk, nodes may be /dev/disk/by-id or /dev/disk/by-path symlinks
+            "device_name": os.path.basename(os.path.realpath(config["node"])),
             "uuid": config["uuid"] if "uuid" in config else None,
             "start": config["start"],
             "size": config["size"],
@@ -0,0 +1,338 @@
+"""
+Raw partition imaging via io_uring.
+
+Copy a partition byte by byte to a file, keeping many reads and writes in flight through a single io_uring instance.
+Requires Linux 5.6 or newer and the optional liburing package (2026.3.30 or newer) from PyPI.
+
+"""
+
+# Authors
+#
+# - pre-alpha 0.0.1 2016 - Matt Comben
+# - GA 1.0.0 2020 - Tomasz Szuster
+#
+# Copyrigh (c)
+#
+# This file is part of pysfdisk.
+#
+# pysfdisk is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# pysfdisk is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pysfdisk.  If not, see <http://www.gnu.org/licenses/>
+
+import os
+import re
+import sys
+import mmap
+import stat
+import ctypes
+import errno
+import functools
+from typing import Union
+
+try:
+    import liburing
+except ImportError:  # pragma: no cover
+    liburing = None
+
+RING_ENTRIES = 256
+QUEUE_DEPTH = 64
+CHUNK_SIZE = 1 << 20
+MINIMUM_KERNEL_VERSION = (5, 6)
+# Indices of the descriptors registered with io_uring_register_files
+SOURCE_FILE_INDEX = 0
+DESTINATION_FILE_INDEX = 1
+# Names of the liburing package used by this module, older releases of the package expose a different cffi based API
+LIBURING_API = (
+    "Cqe",
+    "FileIndex",
+    "Iovec",
+    "Ring",
+    "IORING_SETUP_IOPOLL",
+    "IORING_SETUP_SQPOLL",
+    "IOSQE_ASYNC",
+    "IOSQE_FIXED_FILE",
+    "io_uring_cqe_seen",
+    "io_uring_get_sqe",
+    "io_uring_prep_readv",
+    "io_uring_prep_readv_fixed",
+    "io_uring_prep_writev",
+    "io_uring_prep_writev_fixed",
+    "io_uring_queue_exit",
+    "io_uring_queue_init",
+    "io_uring_register_buffers",
+    "io_uring_register_files",
+    "io_uring_sqe_set_flags",
+    "io_uring_submit",
+    "io_uring_wait_cqe",
+    "probe",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def is_available() -> bool:
+    """
+    Check whether raw partition imaging via io_uring can be used on this host.
+
+    :return: True when running on Linux >= 5.6 with a compatible liburing package installed
+
+    """
+    if sys.platform != "linux" or liburing is None:
+        return False
+    if not all(hasattr(liburing, name) for name in LIBURING_API):
+        return False
+    kernel_version = re.match(r"^(\d+)\.(\d+)", os.uname().release)
+    if not kernel_version:
+        return False
+    return tuple(int(part) for part in kernel_version.groups()) >= MINIMUM_KERNEL_VERSION
+
+
+@functools.lru_cache(maxsize=None)
+def _fixed_vectored_io_supported() -> bool:
+    """
+    Check whether the kernel supports vectored reads and writes from registered buffers (Linux 6.15+).
+
+    :return: True when IORING_OP_READV_FIXED and IORING_OP_WRITEV_FIXED are supported
+
+    """
+    opcodes = liburing.probe() or {}
+    return bool(opcodes.get("IORING_OP_READV_FIXED") and opcodes.get("IORING_OP_WRITEV_FIXED"))
+
+
+def _open_destination(dst_path: str) -> tuple:
+    """
+    Open destination file with O_DIRECT, falling back to buffered I/O when the filesystem does not support it.
+
+    :param dst_path: path of the image file
+    :return: tuple of file descriptor and flag telling whether O_DIRECT is in use
+
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    try:
+        return os.open(dst_path, flags | os.O_DIRECT, 0o644), True
+    except OSError as error:
+        if error.errno != errno.EINVAL:
+            raise
+    return os.open(dst_path, flags, 0o644), False
+
+
+def _check(result: int) -> int:
+    """
+    Raise OSError for a negative errno returned by liburing.
+
+    :param result: return value of a liburing call or cqe result
+    :return: the result when it does not indicate an error
+
+    """
+    if result < 0:
+        raise OSError(-result, os.strerror(-result))
+    return result
+
+
+def dump_partition_raw(src_path: str, dst_path: str, size: Union[int, None] = None, poll: bool = False) -> int:
+    """
+    Copy partition to image file via io_uring, keeping up to QUEUE_DEPTH chunks in flight.
+
+    :param src_path: path of the partition block device, e.g. /dev/sda1
+    :param dst_path: path of the image file which will be created
+    :param size: number of bytes to copy, the whole device is copied when not provided
+    :param poll: use SQPOLL and, where possible, IOPOLL rings
+    :return: number of bytes copied
+
+    """
+    src_fd = os.open(src_path, os.O_RDONLY | os.O_DIRECT)
+    try:
+        dst_fd, dst_direct = _open_destination(dst_path)
+        try:
+            if size is None:
+                size = os.lseek(src_fd, 0, os.SEEK_END)
+            src_is_block_device = stat.S_ISBLK(os.fstat(src_fd).st_mode)
+            setup_flags = 0
+            if poll:
+                setup_flags = liburing.IORING_SETUP_SQPOLL
+                # Files may accept O_DIRECT without supporting polled I/O, IOPOLL requests then fail with EOPNOTSUPP
+                if src_is_block_device and dst_direct and stat.S_ISBLK(os.fstat(dst_fd).st_mode):
+                    setup_flags |= liburing.IORING_SETUP_IOPOLL
+            _copy(src_fd, dst_fd, size, async_reads=src_is_block_device, setup_flags=setup_flags)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    return size
+
+
+def _copy(src_fd: int, dst_fd: int, size: int, async_reads: bool = False, setup_flags: int = 0) -> None:
+    """
+    Run the read/write loop on a freshly created ring.
+
+    :param src_fd: file descriptor of the partition
+    :param dst_fd: file descriptor of the image file
+    :param size: number of bytes to copy
+    :param async_reads: flag reads with IOSQE_ASYNC, meant for reads from block devices
+    :param setup_flags: IORING_SETUP_* flags the ring is created with
+
+    """
+    ring = None
+    buffers = []
+    try:
+        ring = _queue_init(setup_flags)
+        # mmap returns page aligned memory, which O_DIRECT requires
+        buffers.extend(mmap.mmap(-1, CHUNK_SIZE) for _ in range(min(QUEUE_DEPTH, -(-size // CHUNK_SIZE))))
+        if buffers:
+            _RingCopy(ring, buffers, size, async_reads=async_reads).run(src_fd, dst_fd)
+    finally:
+        if ring is not None:
+            liburing.io_uring_queue_exit(ring)
+        for buffer in buffers:
+            buffer.close()
+
+
+def _queue_init(setup_flags: int):
+    """
+    Create a ring, falling back to a ring without submission polling thread when SQPOLL is not permitted.
+
+    :param setup_flags: IORING_SETUP_* flags the ring is created with
+    :return: initialized liburing.Ring
+
+    """
+    ring = liburing.Ring()
+    try:
+        _check(liburing.io_uring_queue_init(RING_ENTRIES, ring, setup_flags))
+    except PermissionError:
+        # Unprivileged processes may only create SQPOLL rings since Linux 5.11
+        if not setup_flags & liburing.IORING_SETUP_SQPOLL:
+            raise
+        ring = liburing.Ring()
+        _check(liburing.io_uring_queue_init(RING_ENTRIES, ring, setup_flags & ~liburing.IORING_SETUP_SQPOLL))
+    return ring
+
+
+def _unowned_view(buffer: mmap.mmap) -> memoryview:
+    """
+    Return memoryview of the buffer memory which does not hold an export of the buffer.
+
+    liburing.Iovec never releases its views, so a view of the mmap itself would keep it from being closed.
+
+    :param buffer: mmap buffer
+    :return: memoryview of the whole buffer
+
+    """
+    address = ctypes.addressof(ctypes.c_char.from_buffer(buffer))
+    return memoryview((ctypes.c_char * len(buffer)).from_address(address))
+
+
+class _RingCopy:
+    """Read/write loop of a single copy, every buffer slot owns at most one request at a time."""
+
+    def __init__(self, ring, buffers: list, size: int, async_reads: bool = False):
+        """Set member variables."""
+        self.ring = ring
+        self.size = size
+        self.views = [_unowned_view(buffer) for buffer in buffers]
+        # One iovec per slot is reused for all full chunks, as liburing.Iovec leaks a reference to its views
+        self.iovecs = [liburing.Iovec([view]) for view in self.views]
+        # Block device reads may otherwise be issued inline and block the submitting thread until the disk answers
+        self.read_flags = liburing.IOSQE_FIXED_FILE | (liburing.IOSQE_ASYNC if async_reads else 0)
+        self.fixed_buffers = False
+        # Offset, length and iovec of the chunk owned by each slot
+        self.chunks = [None] * len(buffers)
+        self.next_offset = 0
+        self.in_flight = 0
+
+    def run(self, src_fd: int, dst_fd: int) -> None:
+        """
+        Register descriptors and buffers with the ring and copy all chunks.
+
+        :param src_fd: file descriptor of the partition
+        :param dst_fd: file descriptor of the image file
+
+        """
+        # The FileIndex must outlive the requests which use the registered descriptors
+        file_index = liburing.FileIndex([src_fd, dst_fd])
+        cqe = liburing.Cqe()
+        # Take file references and pin the buffers once, instead of on every request
+        _check(liburing.io_uring_register_files(self.ring, file_index))
+        if _fixed_vectored_io_supported():
+            self.fixed_buffers = self._register_buffers()
+
+        for slot in range(len(self.views)):
+            self._prep_read(slot)
+
+        while self.in_flight:
+            _check(liburing.io_uring_submit(self.ring))
+            _check(liburing.io_uring_wait_cqe(self.ring, cqe))
+            result, user_data = cqe[0].res, cqe[0].user_data
+            liburing.io_uring_cqe_seen(self.ring, cqe[0])
+            self.in_flight -= 1
+            self._complete(slot=user_data >> 1, is_write=bool(user_data & 1), result=_check(result))
+
+    def _register_buffers(self) -> bool:
+        """
+        Register buffers with the ring.
+
+        Registered buffers are accounted against RLIMIT_MEMLOCK for processes without CAP_IPC_LOCK, the default limit
+        of 8 MiB is lower than QUEUE_DEPTH buffers. Unregistered buffers are used when the kernel refuses to pin them.
+
+        :return: True when the buffers were registered
+
+        """
+        try:
+            _check(liburing.io_uring_register_buffers(self.ring, liburing.Iovec(self.views)))
+        except OSError as error:
+            if error.errno not in (errno.ENOMEM, errno.EPERM):
+                raise
+            return False
+        return True
+
+    def _complete(self, slot: int, is_write: bool, result: int) -> None:
+        """
+        Queue the next request of a slot whose request completed.
+
+        :param slot: index of the buffer slot
+        :param is_write: whether the completed request was a write
+        :param result: number of bytes transferred by the completed request
+
+        """
+        offset, length, _ = self.chunks[slot]
+        if result != length:
+            operation = "write" if is_write else "read"
+            raise OSError(errno.EIO, f"Short {operation} at offset {offset}: {result} of {length} bytes")
+        if not is_write:
+            self._prep(slot, is_write=True)
+        elif self.next_offset < self.size:
+            self._prep_read(slot)
+
+    def _prep_read(self, slot: int) -> None:
+        """Assign the next chunk to a slot and queue its read."""
+        length = min(CHUNK_SIZE, self.size - self.next_offset)
+        # Only the last chunk of the copy can be shorter
+        iovec = self.iovecs[slot] if length == CHUNK_SIZE else liburing.Iovec([self.views[slot][:length]])
+        self.chunks[slot] = (self.next_offset, length, iovec)
+        self.next_offset += length
+        self._prep(slot, is_write=False)
+
+    def _prep(self, slot: int, is_write: bool) -> None:
+        """Queue read or write of the chunk owned by a slot."""
+        offset, _, iovec = self.chunks[slot]
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        if is_write:
+            file_index, flags = DESTINATION_FILE_INDEX, liburing.IOSQE_FIXED_FILE
+            prep = liburing.io_uring_prep_writev_fixed if self.fixed_buffers else liburing.io_uring_prep_writev
+        else:
+            file_index, flags = SOURCE_FILE_INDEX, self.read_flags
+            prep = liburing.io_uring_prep_readv_fixed if self.fixed_buffers else liburing.io_uring_prep_readv
+        if self.fixed_buffers:
+            prep(sqe, file_index, iovec, slot, offset)
+        else:
+            prep(sqe, file_index, iovec, offset)
+        liburing.io_uring_sqe_set_flags(sqe, flags)
+        sqe.user_data = slot << 1 | is_write
+        self.in_flight += 1
@@ -54,4 +54,10 @@ setup(
     url="https://github.com/beskidinstruments/python-sfdisk",
     version=VERSION,
     include_package_data=True,
+    extras_require={
+        # liburing releases before 2026.3.30 expose an incompatible API
+        "uring": ["liburing>=2026.3.30"],
+        "ijson": ["ijson>=3.0"],
+        "orjson": ["orjson"],
+    },
 )
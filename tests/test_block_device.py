@@ -0,0 +1,468 @@
+"""Tests of sfdisk and lsblk output parsing."""
+
+
+# Authors
+#
+# - pre-alpha 0.0.1 2016 - Matt Comben
+# - GA 1.0.0 2020 - Tomasz Szuster
+#
+# Copyrigh (c)
+#
+# This file is part of pysfdisk.
+#
+# pysfdisk is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# pysfdisk is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pysfdisk.  If not, see <http://www.gnu.org/licenses/>
+
+
+import io
+import errno
+import os
+import json
+import shutil
+import subprocess  # nosec # noqa: S404
+
+import pytest
+
+from pysfdisk import block_device  # noqa: I900
+
+SFDISK_OUTPUT = b"""{
+   "partitiontable": {
+      "label": "gpt",
+      "id": "0C4E8A4B-6F8C-4E4B-9D2A-2B5D5F6C7A10",
+      "device": "/dev/sda",
+      "unit": "sectors",
+      "firstlba": 2048,
+      "lastlba": 1000215182,
+      "sectorsize": 512,
+      "partitions": [
+         {
+            "node": "/dev/sda1",
+            "start": 2048,
+            "size": 1048576,
+            "type": "C12A7328-F81F-11D2-BA4B-00A0C93EC93B",
+            "uuid": "A1B2C3D4-0000-4000-8000-000000000001",
+            "name": "EFI System Partition"
+         },
+         {
+            "node": "/dev/sda2",
+            "start": 1050624,
+            "size": 999164559,
+            "type": "0FC63DAF-8483-4772-8E79-3D69D8E477E4",
+            "uuid": "A1B2C3D4-0000-4000-8000-000000000002"
+         }
+      ]
+   }
+}
+"""
+
+PARTITION_TABLE = [
+    ("label", "gpt"),
+    ("id", "0C4E8A4B-6F8C-4E4B-9D2A-2B5D5F6C7A10"),
+    ("device", "/dev/sda"),
+    ("unit", "sectors"),
+    ("firstlba", 2048),
+    ("lastlba", 1000215182),
+    ("sectorsize", 512),
+    (
+        "partitions",
+        {
+            "node": "/dev/sda1",
+            "start": 2048,
+            "size": 1048576,
+            "type": "C12A7328-F81F-11D2-BA4B-00A0C93EC93B",
+            "uuid": "A1B2C3D4-0000-4000-8000-000000000001",
+            "name": "EFI System Partition",
+        },
+    ),
+    (
+        "partitions",
+        {
+            "node": "/dev/sda2",
+            "start": 1050624,
+            "size": 999164559,
+            "type": "0FC63DAF-8483-4772-8E79-3D69D8E477E4",
+            "uuid": "A1B2C3D4-0000-4000-8000-000000000002",
+        },
+    ),
+]
+
+LSBLK_OUTPUT = """NAME="sda" TYPE="disk" FSTYPE=""
+NAME="sda1" TYPE="part" FSTYPE="vfat"
+NAME="sda2" TYPE="part" FSTYPE="ext4"
+NAME="sda3" TYPE="part" FSTYPE=""
+NAME="sr0" TYPE="rom" FSTYPE="iso9660"
+"""
+
+
+def _script(directory, name, body):
+    path = directory / name
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture()
+def block_device_instance(tmp_path):
+    # Skip __init__, which requires root and a real block device
+    instance = object.__new__(block_device.BlockDevice)
+    instance.path = "/dev/sda"
+    instance.use_sudo = False
+    instance._cmd_prefix = []
+    instance._fs_types_cache = None
+    instance._temp_dir = str(tmp_path / "dump")
+    os.mkdir(instance._temp_dir)
+    return instance
+
+
+@pytest.mark.skipif(block_device.ijson is None, reason="ijson is not installed")
+def test_iter_partition_table_ijson():
+    assert list(block_device.iter_partition_table(io.BytesIO(SFDISK_OUTPUT))) == PARTITION_TABLE
+
+
+@pytest.mark.parametrize("json_loads", [block_device.json_loads, json.loads])
+def test_iter_partition_table_buffered(monkeypatch, json_loads):
+    monkeypatch.setattr(block_device, "ijson", None)
+    monkeypatch.setattr(block_device, "json_loads", json_loads)
+
+    assert list(block_device.iter_partition_table(io.BytesIO(SFDISK_OUTPUT))) == PARTITION_TABLE
+
+
+def test_read_partition_table(block_device_instance):
+    block_device_instance._read_partition_table(io.BytesIO(SFDISK_OUTPUT))
+
+    assert block_device_instance.label == "gpt"
+    assert block_device_instance.uuid == "0C4E8A4B-6F8C-4E4B-9D2A-2B5D5F6C7A10"
+    assert sorted(block_device_instance.partitions) == ["1", "2"]
+    assert block_device_instance.partitions["2"].start == 1050624
+
+
+@pytest.mark.parametrize("disk_node", ["/dev/sda", "/dev/nvme0n1p"])
+def test_read_partition_table_many_partitions(block_device_instance, disk_node):
+    partitions = [{"node": f"{disk_node}{number}", "start": number * 2048, "size": 2048} for number in range(1, 13)]
+    sfdisk_output = json.dumps({"partitiontable": {"label": "gpt", "partitions": partitions}}).encode()
+
+    block_device_instance._read_partition_table(io.BytesIO(sfdisk_output))
+
+    assert sorted(block_device_instance.partitions, key=int) == [str(number) for number in range(1, 13)]
+    assert [partition.node for partition in block_device_instance.partitions.values()] == [
+        partition["node"] for partition in partitions
+    ]
+
+
+def test_collect_disk_info_failure_with_unread_output(tmp_path, block_device_instance):
+    # Invalid partition table followed by more output than fits into a pipe
+    body = f'echo "{block_device.DISK_INFO_SEPARATOR}"; echo "{{invalid"; head -c 1048576 /dev/zero; exit 2'
+    block_device_instance.SH_EXEC = _script(tmp_path, "sh", body)
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        block_device_instance._collect_disk_info()
+
+    assert error.value.returncode == 2
+
+
+def test_ensure_exists_missing_path(tmp_path, block_device_instance):
+    block_device_instance.path = str(tmp_path / "missing")
+
+    with pytest.raises(block_device.BlockDeviceDoesNotExist):
+        block_device_instance._ensure_exists()
+
+
+def test_ensure_exists_not_a_block_device(tmp_path, block_device_instance):
+    regular_file = tmp_path / "disk.img"
+    regular_file.write_bytes(b"")
+    block_device_instance.path = str(regular_file)
+
+    with pytest.raises(block_device.NotABlockDevice):
+        block_device_instance._ensure_exists()
+
+
+@pytest.fixture()
+def disk_image(tmp_path):
+    disk_image = tmp_path / "disk.img"
+    disk_image.write_bytes(bytes(range(256)) * 4)
+    return disk_image
+
+
+def test_dump_mbr(disk_image, block_device_instance):
+    block_device_instance.path = str(disk_image)
+
+    block_device_instance.dump_mbr(destination_file="mbr")
+
+    assert (disk_image.parent / "dump" / "mbr").read_bytes() == disk_image.read_bytes()[: block_device.MBR_SIZE]
+
+
+def _deny_open(path, flags, *args, **kwargs):
+    raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+
+
+def test_dump_mbr_sudo_fallback(monkeypatch, disk_image, block_device_instance):
+    block_device_instance.path = str(disk_image)
+    block_device_instance.use_sudo = True
+    block_device_instance.DD_EXEC = shutil.which("dd")
+    monkeypatch.setattr(block_device.os, "open", _deny_open)
+
+    block_device_instance.dump_mbr(destination_file="mbr")
+
+    assert (disk_image.parent / "dump" / "mbr").read_bytes() == disk_image.read_bytes()[: block_device.MBR_SIZE]
+
+
+def test_dump_mbr_permission_denied_without_sudo(monkeypatch, disk_image, block_device_instance):
+    block_device_instance.path = str(disk_image)
+    monkeypatch.setattr(block_device.os, "open", _deny_open)
+
+    with pytest.raises(PermissionError):
+        block_device_instance.dump_mbr(destination_file="mbr")
+
+    assert not (disk_image.parent / "dump" / "mbr").exists()
+
+
+def test_lsblk_line_re():
+    matches = [block_device.LSBLK_LINE_RE.match(line) for line in LSBLK_OUTPUT.splitlines()]
+
+    assert [match.groups() for match in matches] == [
+        ("sda", "disk", ""),
+        ("sda1", "part", "vfat"),
+        ("sda2", "part", "ext4"),
+        ("sda3", "part", ""),
+        ("sr0", "rom", "iso9660"),
+    ]
+
+
+def test_get_fs_types(block_device_instance):
+    assert block_device_instance.get_fs_types(lsblk_output=LSBLK_OUTPUT) == {"sda1": "vfat", "sda2": "ext4"}
+    # Parsed result is cached for calls which do not provide lsblk output
+    assert block_device_instance.get_fs_types() == {"sda1": "vfat", "sda2": "ext4"}
+
+
+def test_dump_partition_table_compressed(tmp_path, block_device_instance):
+    block_device_instance.SFDISK_EXEC = _script(tmp_path, "sfdisk", 'echo "label: gpt"')
+    block_device_instance.PXZ_EXEC = shutil.which("cat")
+    destination = tmp_path / "partition_table.xz"
+
+    assert block_device_instance.dump_partition_table_compressed(str(destination)) == str(destination)
+    assert destination.read_bytes() == b"label: gpt\n"
+
+
+def test_dump_partition_table_compressed_sfdisk_failure(tmp_path, block_device_instance):
+    block_device_instance.SFDISK_EXEC = _script(tmp_path, "sfdisk", "exit 3")
+    block_device_instance.PXZ_EXEC = shutil.which("cat")
+    destination = tmp_path / "partition_table.xz"
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        block_device_instance.dump_partition_table_compressed(str(destination))
+
+    assert error.value.returncode == 3
+    assert not destination.exists()
+
+
+def test_dump_partition_table_compressed_pxz_not_started(tmp_path, block_device_instance):
+    block_device_instance.SFDISK_EXEC = _script(tmp_path, "sfdisk", 'echo "label: gpt"')
+    block_device_instance.PXZ_EXEC = str(tmp_path / "missing-pxz")
+    destination = tmp_path / "partition_table.xz"
+
+    with pytest.raises(FileNotFoundError):
+        block_device_instance.dump_partition_table_compressed(str(destination))
+
+    assert not destination.exists()
+
+
+def test_dump_partition_table_compressed_destination_not_opened(tmp_path, monkeypatch, block_device_instance):
+    def open_destination(file, mode="r", *args, **kwargs):
+        raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), file)
+
+    destination = tmp_path / "existing.xz"
+    destination.write_bytes(b"previous archive")
+    monkeypatch.setattr(block_device, "open", open_destination, raising=False)
+
+    with pytest.raises(PermissionError):
+        block_device_instance.dump_partition_table_compressed(str(destination))
+
+    assert destination.read_bytes() == b"previous archive"
+
+
+class FakePopen:
+    """Stand-in for subprocess.Popen, processes exit with the result configured for their executable on wait."""
+
+    results = {}
+    started = []
+    running = 0
+    max_running = 0
+
+    def __init__(self, args, stdout=None, stderr=None):
+        if args[0] not in self.results:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), args[0])
+        self.args = args
+        self.returncode = None
+        self.killed = False
+        returncode, stderr_output = self.results[args[0]]
+        self.result = returncode
+        stderr.write(stderr_output)
+        stderr.flush()
+        FakePopen.started.append(self)
+        FakePopen.running += 1
+        FakePopen.max_running = max(FakePopen.max_running, FakePopen.running)
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+
+    def wait(self):
+        if self.returncode is None:
+            self.returncode = -9 if self.killed else self.result
+            FakePopen.running -= 1
+        return self.returncode
+
+
+@pytest.fixture()
+def fake_popen(monkeypatch):
+    monkeypatch.setattr(FakePopen, "results", {"partclone": (0, b"")})
+    monkeypatch.setattr(FakePopen, "started", [])
+    monkeypatch.setattr(FakePopen, "running", 0)
+    monkeypatch.setattr(FakePopen, "max_running", 0)
+    monkeypatch.setattr(block_device.subprocess, "Popen", FakePopen)
+    return FakePopen
+
+
+def test_run_dumps_limits_concurrent_processes(fake_popen):
+    commands = [["partclone", "-s", f"/dev/sda{number}"] for number in range(1, 6)]
+
+    block_device._run_dumps(commands, raw_dumps=[], poll=False, max_workers=2)
+
+    assert [process.args for process in fake_popen.started] == commands
+    assert fake_popen.max_running == 2
+    assert all(process.returncode == 0 for process in fake_popen.started)
+
+
+def test_run_dumps_start_failure_stops_started_processes(fake_popen):
+    with pytest.raises(FileNotFoundError):
+        block_device._run_dumps([["partclone"], ["partclone"], ["missing"]], raw_dumps=[], poll=False, max_workers=3)
+
+    assert len(fake_popen.started) == 2
+    assert all(process.killed and process.returncode == -9 for process in fake_popen.started)
+    assert fake_popen.running == 0
+
+
+def test_run_dumps_raw_failure_stops_started_processes(monkeypatch, fake_popen):
+    def dump_partition_raw(src_path, dst_path, poll):
+        raise OSError(errno.EIO, os.strerror(errno.EIO), src_path)
+
+    monkeypatch.setattr(block_device.uring_backend, "dump_partition_raw", dump_partition_raw)
+
+    with pytest.raises(OSError):
+        block_device._run_dumps([["partclone"]], raw_dumps=[("/dev/sda2", "sda2")], poll=False, max_workers=2)
+
+    assert fake_popen.started[0].killed
+    assert fake_popen.running == 0
+
+
+def test_run_dumps_failure_reports_stderr(fake_popen):
+    fake_popen.results["partclone-failing"] = (1, b"partclone: read error\n")
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        block_device._run_dumps([["partclone"], ["partclone-failing"]], raw_dumps=[], poll=False, max_workers=2)
+
+    assert error.value.cmd == ["partclone-failing"]
+    assert error.value.returncode == 1
+    assert error.value.stderr == b"partclone: read error\n"
+
+
+def test_dump_partitions_invalid_max_workers(block_device_instance):
+    with pytest.raises(ValueError):
+        block_device_instance.dump_partitions(max_workers=0)
+
+
+def _executables(**executables):
+    return lambda name: executables.get(name)
+
+
+@pytest.fixture()
+def partitioned_instance(monkeypatch, block_device_instance):
+    partitions = [{"node": f"/dev/sda{number}", "start": number * 2048, "size": 2048} for number in range(1, 4)]
+    sfdisk_output = json.dumps({"partitiontable": {"label": "gpt", "partitions": partitions}}).encode()
+    block_device_instance._read_partition_table(io.BytesIO(sfdisk_output))
+    block_device_instance.get_fs_types(lsblk_output=LSBLK_OUTPUT)
+    # Only partclone.fat is installed, sda2 holds ext4 and sda3 has no filesystem
+    monkeypatch.setattr(block_device, "find_executable", _executables(**{"partclone.fat": "partclone"}))
+    return block_device_instance
+
+
+@pytest.fixture()
+def raw_dumps(monkeypatch):
+    raw_dumps = []
+
+    def dump_partition_raw(src_path, dst_path, poll):
+        raw_dumps.append((src_path, dst_path, poll))
+
+    monkeypatch.setattr(block_device.uring_backend, "dump_partition_raw", dump_partition_raw)
+    return raw_dumps
+
+
+def test_dump_partitions_raw_without_partclone(monkeypatch, fake_popen, raw_dumps, partitioned_instance):
+    monkeypatch.setattr(block_device.uring_backend, "is_available", lambda: True)
+    monkeypatch.setattr(block_device.os, "access", lambda path, mode: True)
+    dump_dir = partitioned_instance._temp_dir
+
+    destination_files = partitioned_instance.dump_partitions()
+
+    assert [process.args for process in fake_popen.started] == [
+        ["partclone", "-I", "-F", "-d", "-c", "-s", "/dev/sda1", "-o", f"{dump_dir}/sda1"]
+    ]
+    assert raw_dumps == [("/dev/sda2", f"{dump_dir}/sda2", False), ("/dev/sda3", f"{dump_dir}/sda3", False)]
+    assert destination_files == {name: f"{dump_dir}/{name}" for name in ("sda1", "sda2", "sda3")}
+
+
+def test_dump_partitions_fast_backup(monkeypatch, fake_popen, raw_dumps, partitioned_instance):
+    monkeypatch.setattr(block_device.uring_backend, "is_available", lambda: True)
+    monkeypatch.setattr(block_device.os, "access", lambda path, mode: True)
+
+    partitioned_instance.dump_partitions(fast_backup=True)
+
+    assert fake_popen.started == []
+    assert [(src_path, poll) for src_path, _, poll in raw_dumps] == [
+        ("/dev/sda1", True),
+        ("/dev/sda2", True),
+        ("/dev/sda3", True),
+    ]
+
+
+def test_dump_partitions_skips_partitions_without_backend(
+    monkeypatch, caplog, fake_popen, raw_dumps, partitioned_instance
+):
+    monkeypatch.setattr(block_device.uring_backend, "is_available", lambda: False)
+
+    destination_files = partitioned_instance.dump_partitions()
+
+    assert [process.args[-3] for process in fake_popen.started] == ["/dev/sda1"]
+    assert raw_dumps == []
+    assert list(destination_files) == ["sda1"]
+    assert [record.args[0] for record in caplog.records if record.levelname == "WARNING"] == ["/dev/sda2", "/dev/sda3"]
+
+
+def test_dump_partitions_sudo_batches_chmod(monkeypatch, fake_popen, raw_dumps, partitioned_instance):
+    fake_popen.results["sudo"] = (0, b"")
+    check_output_calls = []
+    monkeypatch.setattr(block_device.subprocess, "check_output", check_output_calls.append)
+    monkeypatch.setattr(
+        block_device, "find_executable", _executables(**{"partclone.fat": "partclone", "partclone.ext4": "pc"})
+    )
+    monkeypatch.setattr(block_device.uring_backend, "is_available", lambda: False)
+    partitioned_instance.use_sudo = True
+    partitioned_instance._cmd_prefix = ["sudo"]
+    dump_dir = partitioned_instance._temp_dir
+
+    partitioned_instance.dump_partitions()
+
+    assert [process.args[:2] for process in fake_popen.started] == [["sudo", "partclone"], ["sudo", "pc"]]
+    assert check_output_calls == [["sudo", "chmod", "644", f"{dump_dir}/sda1", f"{dump_dir}/sda2"]]
@@ -0,0 +1,41 @@
+"""Tests of partition objects."""
+
+
+# Authors
+#
+# - pre-alpha 0.0.1 2016 - Matt Comben
+# - GA 1.0.0 2020 - Tomasz Szuster
+#
+# Copyrigh (c)
+#
+# This file is part of pysfdisk.
+#
+# pysfdisk is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# pysfdisk is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pysfdisk.  If not, see <http://www.gnu.org/licenses/>
+
+
+from pysfdisk.partition import Partition  # noqa: I900
+
+
+def test_device_name_of_symlinked_node(tmp_path):
+    # sfdisk reports partitions of /dev/disk/by-id paths as symlinks to the kernel device nodes
+    kernel_node = tmp_path / "sda1"
+    kernel_node.touch()
+    node = tmp_path / "ata-DISK_SERIAL-part1"
+    node.symlink_to(kernel_node)
+
+    partition = Partition.load_from_sfdisk_output({"node": str(node), "start": 2048, "size": 1048576}, None)
+
+    assert partition.node == str(node)
+    assert partition.device_name == "sda1"
+    assert partition.get_partition_number() == "1"
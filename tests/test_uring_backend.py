@@ -0,0 +1,166 @@
+"""Tests of raw partition imaging via io_uring."""
+
+
+# Authors
+#
+# - pre-alpha 0.0.1 2016 - Matt Comben
+# - GA 1.0.0 2020 - Tomasz Szuster
+#
+# Copyrigh (c)
+#
+# This file is part of pysfdisk.
+#
+# pysfdisk is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# pysfdisk is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pysfdisk.  If not, see <http://www.gnu.org/licenses/>
+
+
+import os
+import errno
+
+import pytest
+
+from pysfdisk import uring_backend  # noqa: I900
+
+pytestmark = pytest.mark.skipif(not uring_backend.is_available(), reason="io_uring backend is not available")
+
+# Not a multiple of CHUNK_SIZE and larger than QUEUE_DEPTH chunks, so slots are reused and the last chunk is short
+DATA_SIZE = (uring_backend.QUEUE_DEPTH + 3) * uring_backend.CHUNK_SIZE + 4096
+
+
+@pytest.fixture(scope="module")
+def source_data():
+    return os.urandom(DATA_SIZE)
+
+
+@pytest.fixture()
+def source_file(tmp_path, source_data):
+    path = tmp_path / "source.img"
+    path.write_bytes(source_data)
+    return path
+
+
+@pytest.mark.parametrize("fixed_buffers", [True, False])
+def test_copy_regular_file(tmp_path, monkeypatch, source_file, source_data, fixed_buffers):
+    if fixed_buffers and not uring_backend._fixed_vectored_io_supported():
+        pytest.skip("kernel does not support vectored I/O from registered buffers")
+    monkeypatch.setattr(uring_backend, "_fixed_vectored_io_supported", lambda: fixed_buffers)
+    destination = tmp_path / "destination.img"
+
+    src_fd = os.open(source_file, os.O_RDONLY)
+    dst_fd = os.open(destination, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        uring_backend._copy(src_fd, dst_fd, DATA_SIZE)
+    finally:
+        os.close(dst_fd)
+        os.close(src_fd)
+
+    assert destination.read_bytes() == source_data
+
+
+def test_copy_memlock_limit(tmp_path, monkeypatch, source_file, source_data):
+    def register_buffers(ring, iovecs):
+        raise OSError(errno.ENOMEM, os.strerror(errno.ENOMEM))
+
+    monkeypatch.setattr(uring_backend, "_fixed_vectored_io_supported", lambda: True)
+    monkeypatch.setattr(uring_backend.liburing, "io_uring_register_buffers", register_buffers)
+    destination = tmp_path / "destination.img"
+
+    src_fd = os.open(source_file, os.O_RDONLY)
+    dst_fd = os.open(destination, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        uring_backend._copy(src_fd, dst_fd, DATA_SIZE)
+    finally:
+        os.close(dst_fd)
+        os.close(src_fd)
+
+    assert destination.read_bytes() == source_data
+
+
+def test_copy_partial(tmp_path, source_file, source_data):
+    destination = tmp_path / "destination.img"
+    size = uring_backend.CHUNK_SIZE + 8192
+
+    src_fd = os.open(source_file, os.O_RDONLY)
+    dst_fd = os.open(destination, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        uring_backend._copy(src_fd, dst_fd, size, async_reads=True)
+    finally:
+        os.close(dst_fd)
+        os.close(src_fd)
+
+    assert destination.read_bytes() == source_data[:size]
+
+
+def test_copy_write_error(source_file):
+    src_fd = os.open(source_file, os.O_RDONLY)
+    try:
+        # Writes to a read only descriptor fail
+        with pytest.raises(OSError, match="Bad file descriptor"):
+            uring_backend._copy(src_fd, src_fd, uring_backend.CHUNK_SIZE)
+    finally:
+        os.close(src_fd)
+
+
+def test_dump_partition_raw(tmp_path, source_file, source_data):
+    destination = tmp_path / "destination.img"
+
+    try:
+        copied = uring_backend.dump_partition_raw(src_path=str(source_file), dst_path=str(destination))
+    except OSError as error:
+        if error.errno != errno.EINVAL:
+            raise
+        pytest.skip("O_DIRECT is not supported by the filesystem of the temporary directory")
+
+    assert copied == DATA_SIZE
+    assert destination.read_bytes() == source_data
+
+
+def test_dump_partition_raw_poll(tmp_path, source_file, source_data):
+    destination = tmp_path / "destination.img"
+
+    try:
+        copied = uring_backend.dump_partition_raw(src_path=str(source_file), dst_path=str(destination), poll=True)
+    except OSError as error:
+        if error.errno != errno.EINVAL:
+            raise
+        pytest.skip("O_DIRECT is not supported by the filesystem of the temporary directory")
+
+    assert copied == DATA_SIZE
+    assert destination.read_bytes() == source_data
+
+
+def test_queue_init_without_sqpoll_permission(monkeypatch):
+    queue_init = uring_backend.liburing.io_uring_queue_init
+    setup_flags = []
+
+    def io_uring_queue_init(entries, ring, flags):
+        setup_flags.append(flags)
+        if flags & uring_backend.liburing.IORING_SETUP_SQPOLL:
+            raise PermissionError(errno.EPERM, os.strerror(errno.EPERM))
+        return queue_init(entries, ring, flags)
+
+    monkeypatch.setattr(uring_backend.liburing, "io_uring_queue_init", io_uring_queue_init)
+    ring = uring_backend._queue_init(uring_backend.liburing.IORING_SETUP_SQPOLL)
+    uring_backend.liburing.io_uring_queue_exit(ring)
+
+    assert setup_flags == [uring_backend.liburing.IORING_SETUP_SQPOLL, 0]
+
+
+def test_is_available_requires_current_liburing_api(monkeypatch):
+    monkeypatch.delattr(uring_backend.liburing, "Iovec")
+    uring_backend.is_available.cache_clear()
+    try:
+        assert not uring_backend.is_available()
+    finally:
+        monkeypatch.undo()
+        uring_backend.is_available.cache_clear()